@@ -6,9 +6,14 @@ from typing import Optional
 import joblib
 import numpy as np
 import os
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
 
-from src.api.pydantic_models import Features, PredictionResponse
+from src.api import codecs
+from src.api.pydantic_models import BatchFeatures, BatchPredictionResponse, Features, PredictionResponse
+from src.models.calibration import IDENTITY_POLICY, DecisionPolicy, load_policy
+from src.monitoring.drift import FEATURE_NAMES, DriftMonitor, load_reference
 
 try:
     import mlflow
@@ -18,6 +23,13 @@ except Exception:
 
 MODEL_PATH = os.environ.get('MODEL_PATH', 'models/model_best.joblib')
 MLFLOW_MODEL_URI = os.environ.get('MLFLOW_MODEL_URI')
+REFERENCE_PATH = os.environ.get(
+    'REFERENCE_PATH', os.path.join(os.path.dirname(MODEL_PATH), 'reference_distribution.json')
+)
+CALIBRATION_PATH = os.environ.get(
+    'CALIBRATION_PATH', os.path.join(os.path.dirname(MODEL_PATH), 'calibration.json')
+)
+MONITOR_BATCH_SIZE = int(os.environ.get('MONITOR_BATCH_SIZE', '256'))
 
 
 
@@ -25,6 +37,9 @@ MLFLOW_MODEL_URI = os.environ.get('MLFLOW_MODEL_URI')
 
 app = FastAPI()
 _model = None
+_monitor = None
+_monitor_disabled = False
+_policy = None
 
 
 def load_model() -> Optional[object]:
@@ -48,33 +63,116 @@ def load_model() -> Optional[object]:
     return _model
 
 
+def load_monitor() -> Optional[DriftMonitor]:
+    global _monitor, _monitor_disabled
+    if _monitor is not None or _monitor_disabled:
+        return _monitor
+    reference = load_reference(REFERENCE_PATH)
+    if reference is None:
+        return None
+    try:
+        _monitor = DriftMonitor(reference, batch_size=MONITOR_BATCH_SIZE)
+    except ValueError:
+        # reference was built for a different feature set; don't re-read it on every request
+        _monitor_disabled = True
+        return None
+    return _monitor
+
+
+def load_decision_policy() -> DecisionPolicy:
+    """Calibration map and threshold saved by ``train_models``; identity map and 0.5 if absent."""
+    global _policy
+    if _policy is None:
+        _policy = load_policy(CALIBRATION_PATH) or DecisionPolicy(IDENTITY_POLICY)
+    return _policy
+
+
 @app.get('/')
 def root():
     return {'status': 'ok'}
 
 
-@app.post('/predict', response_model=PredictionResponse)
-def predict(features: Features):
+def _score(model, X: np.ndarray) -> np.ndarray:
+    """Return positive-class probabilities for each row of ``X``."""
+    # mlflow.pyfunc models expose a ``predict`` that returns probabilities
+    try:
+        if hasattr(model, 'predict_proba'):
+            return np.asarray(model.predict_proba(X)[:, 1], dtype=float)
+        return np.asarray(model.predict(X), dtype=float).reshape(-1)
+    except Exception:
+        # last-resort: cast predict to float
+        return np.asarray(model.predict(X), dtype=float).reshape(-1)
+
+
+def _score_and_observe(X: np.ndarray) -> np.ndarray:
     model = load_model()
     if model is None:
         raise HTTPException(status_code=503, detail='Model not available')
+    proba = _score(model, X)
+    monitor = load_monitor()
+    if monitor is not None:
+        monitor.observe(X, proba)
+    return proba
+
+
+@app.post('/predict', response_model=PredictionResponse)
+def predict(features: Features):
     X = np.array([[features.recency_days, features.frequency, features.monetary]])
-    # mlflow.pyfunc models expose a ``predict`` that returns probabilities
+    proba, pred = load_decision_policy().decide(_score_and_observe(X))
+    return PredictionResponse(probability=float(proba[0]), prediction=int(pred[0]))
+
+
+@app.post('/predict/batch', response_model=BatchPredictionResponse)
+async def predict_batch(request: Request):
+    """Score many rows at once.
+
+    The request body may be JSON (``BatchFeatures``), a raw little-endian
+    tensor (``application/x-crm-tensor``) or an Arrow IPC stream. Binary
+    payloads are wrapped as NumPy arrays without per-row Python objects. The
+    response format follows ``Accept`` and defaults to the request format.
+    """
+    body = await request.body()
+    content_type = codecs.media_type(request.headers.get('content-type')) or codecs.JSON_MEDIA_TYPE
+    accept = codecs.media_type(request.headers.get('accept'))
+    # decoding, scoring and encoding are CPU-bound; keep them off the event loop
+    return await run_in_threadpool(_score_batch, body, content_type, accept)
+
+
+def _score_batch(body: bytes, content_type: str, accept: str):
     try:
-        if hasattr(model, 'predict_proba'):
-            prob = float(model.predict_proba(X)[:, 1][0])
+        if content_type == codecs.TENSOR_MEDIA_TYPE:
+            X = codecs.decode_tensor(body, n_cols=len(FEATURE_NAMES))
+        elif content_type == codecs.ARROW_MEDIA_TYPE and codecs.pa is not None:
+            X = codecs.decode_arrow(body, FEATURE_NAMES)
+        elif content_type == codecs.JSON_MEDIA_TYPE:
+            batch = BatchFeatures.model_validate_json(body)
+            X = np.array([[f.recency_days, f.frequency, f.monetary] for f in batch.instances], dtype=float)
         else:
-            pred = model.predict(X)
-            # if predict returns probability-like float array
-            if isinstance(pred, np.ndarray) and pred.dtype == float and pred.size == 1:
-                prob = float(pred[0])
-            else:
-                prob = float(pred[0])
-    except Exception:
-        # last-resort: cast predict to float
-        prob = float(model.predict(X)[0])
-    pred = int(prob >= 0.5)
-    return PredictionResponse(probability=prob, prediction=pred)
+            raise HTTPException(status_code=415, detail=f'Unsupported content type: {content_type}')
+    except (ValueError, ValidationError) as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    X = X.reshape(-1, len(FEATURE_NAMES))
+    if X.shape[0] == 0:
+        raise HTTPException(status_code=400, detail='Batch contains no rows')
+    if not np.isfinite(X).all():
+        raise HTTPException(status_code=400, detail='Batch contains NaN or infinite values')
+
+    proba, pred = load_decision_policy().decide(_score_and_observe(X))
+
+    if accept not in (codecs.JSON_MEDIA_TYPE, codecs.TENSOR_MEDIA_TYPE, codecs.ARROW_MEDIA_TYPE):
+        accept = content_type
+    if accept == codecs.TENSOR_MEDIA_TYPE:
+        dtype = X.dtype if X.dtype in codecs.TENSOR_DTYPES.values() else np.float64
+        # two columns: calibrated probability, thresholded decision (0.0 / 1.0)
+        content = codecs.encode_tensor(np.column_stack([proba, pred]), dtype=dtype)
+        return Response(content=content, media_type=accept)
+    if accept == codecs.ARROW_MEDIA_TYPE and codecs.pa is not None:
+        content = codecs.encode_arrow(probability=proba, prediction=pred.astype(np.int8))
+        return Response(content=content, media_type=accept)
+    return BatchPredictionResponse(
+        probabilities=proba.tolist(),
+        predictions=pred.tolist(),
+    )
 
 
 @app.get('/model-info')
@@ -83,4 +181,13 @@ def model_info():
     if model is None:
         raise HTTPException(status_code=404, detail='Model not available')
     source = getattr(model, '__loaded_from__', 'unknown')
-    return {'model_source': source}
+    policy = load_decision_policy()
+    return {'model_source': source, 'calibration': policy.method, 'threshold': policy.threshold}
+
+
+@app.get('/monitoring')
+def monitoring():
+    monitor = load_monitor()
+    if monitor is None:
+        raise HTTPException(status_code=404, detail='Reference distribution not available')
+    return {'reference_path': REFERENCE_PATH, 'variables': monitor.snapshot()}
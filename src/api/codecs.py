@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import struct
+from typing import Sequence
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+except Exception:
+    pa = None
+
+JSON_MEDIA_TYPE = 'application/json'
+TENSOR_MEDIA_TYPE = 'application/x-crm-tensor'
+ARROW_MEDIA_TYPE = 'application/vnd.apache.arrow.stream'
+
+# Raw tensor layout: 16-byte little-endian header followed by a row-major buffer.
+#   magic (4s) | version (B) | dtype code (B) | n_cols (H) | n_rows (Q)
+# The header is 16 bytes so float64 payloads stay 8-byte aligned.
+TENSOR_MAGIC = b'CRMT'
+TENSOR_VERSION = 1
+TENSOR_HEADER = struct.Struct('<4sBBHQ')
+TENSOR_DTYPES = {1: np.dtype('<f4'), 2: np.dtype('<f8')}
+_DTYPE_CODES = {dt: code for code, dt in TENSOR_DTYPES.items()}
+
+
+def decode_tensor(body: bytes, n_cols: int) -> np.ndarray:
+    """Wrap a raw tensor payload as an (n_rows, n_cols) array without copying."""
+    if len(body) < TENSOR_HEADER.size:
+        raise ValueError('payload shorter than tensor header')
+    magic, version, code, cols, rows = TENSOR_HEADER.unpack_from(body)
+    if magic != TENSOR_MAGIC or version != TENSOR_VERSION:
+        raise ValueError('unrecognised tensor header')
+    if code not in TENSOR_DTYPES:
+        raise ValueError(f'unsupported tensor dtype code: {code}')
+    if cols != n_cols:
+        raise ValueError(f'expected {n_cols} columns, got {cols}')
+    dtype = TENSOR_DTYPES[code]
+    expected = TENSOR_HEADER.size + rows * cols * dtype.itemsize
+    if len(body) != expected:
+        raise ValueError(f'payload length {len(body)} does not match header ({expected})')
+    return np.frombuffer(body, dtype=dtype, count=rows * cols, offset=TENSOR_HEADER.size).reshape(rows, cols)
+
+
+def encode_tensor(values: np.ndarray, dtype=np.float64) -> bytes:
+    """Serialise a 1-D or 2-D array in the raw tensor layout."""
+    dtype = np.dtype(dtype).newbyteorder('<')
+    if dtype not in _DTYPE_CODES:
+        raise ValueError(f'unsupported tensor dtype: {dtype}')
+    arr = np.ascontiguousarray(values, dtype=dtype)
+    if arr.ndim == 1:
+        arr = arr.reshape(-1, 1)
+    rows, cols = arr.shape
+    header = TENSOR_HEADER.pack(TENSOR_MAGIC, TENSOR_VERSION, _DTYPE_CODES[dtype], cols, rows)
+    return header + arr.tobytes()
+
+
+def decode_arrow(body: bytes, columns: Sequence[str]) -> np.ndarray:
+    """Read an Arrow IPC stream and return the requested columns as a float array."""
+    if pa is None:
+        raise RuntimeError('pyarrow is not installed')
+    table = pa.ipc.open_stream(pa.py_buffer(body)).read_all()
+    missing = [c for c in columns if c not in table.column_names]
+    if missing:
+        raise ValueError(f'arrow payload is missing columns: {missing}')
+    return np.column_stack([table.column(c).to_numpy() for c in columns]).astype(float, copy=False)
+
+
+def encode_arrow(**columns: np.ndarray) -> bytes:
+    """Serialise named 1-D arrays as a single-batch Arrow IPC stream."""
+    if pa is None:
+        raise RuntimeError('pyarrow is not installed')
+    table = pa.table({name: pa.array(np.asarray(values)) for name, values in columns.items()})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def media_type(header: str | None) -> str:
+    """Normalise a Content-Type / Accept header to a bare media type."""
+    if not header:
+        return ''
+    return header.split(';', 1)[0].split(',', 1)[0].strip().lower()
@@ -1,3 +1,5 @@
+from typing import List
+
 from pydantic import BaseModel
 
 class Features(BaseModel):
@@ -8,3 +10,10 @@ class Features(BaseModel):
 class PredictionResponse(BaseModel):
     probability: float
     prediction: int
+
+class BatchFeatures(BaseModel):
+    instances: List[Features]
+
+class BatchPredictionResponse(BaseModel):
+    probabilities: List[float]
+    predictions: List[int]
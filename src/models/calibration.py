@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+from sklearn.isotonic import IsotonicRegression
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import train_test_split
+
+# Pass-through calibration with the conventional 0.5 cut-off
+IDENTITY_POLICY = {'method': 'identity', 'x': [0.0, 1.0], 'y': [0.0, 1.0], 'threshold': 0.5}
+
+
+def fit_calibration(y_true, proba, method: str = 'isotonic', grid_size: int = 1001) -> Dict[str, list]:
+    """Fit a probability calibration map and return it as interpolation knots.
+
+    The map is applied with ``np.interp(p, x, y)``. For `isotonic` the knots are
+    the fitted step boundaries, so interpolation reproduces the model exactly;
+    for `platt` (a logistic fit on the log-odds) the sigmoid is tabulated on a
+    uniform grid of `grid_size` points over [0, 1].
+    """
+    y_true = np.asarray(y_true, dtype=float)
+    proba = np.asarray(proba, dtype=float)
+    if method == 'isotonic':
+        iso = IsotonicRegression(y_min=0.0, y_max=1.0, out_of_bounds='clip')
+        iso.fit(proba, y_true)
+        x, y = iso.X_thresholds_, iso.y_thresholds_
+    elif method == 'platt':
+        lr = LogisticRegression(C=1e6)
+        lr.fit(_logit(proba).reshape(-1, 1), y_true)
+        x = np.linspace(0.0, 1.0, grid_size)
+        y = lr.predict_proba(_logit(x).reshape(-1, 1))[:, 1]
+    else:
+        raise ValueError(f'unknown calibration method: {method}')
+    return {'method': method, 'x': np.asarray(x, dtype=float).tolist(), 'y': np.asarray(y, dtype=float).tolist()}
+
+
+def _logit(p: np.ndarray, eps: float = 1e-6) -> np.ndarray:
+    p = np.clip(p, eps, 1 - eps)
+    return np.log(p / (1 - p))
+
+
+def threshold_curve(y_true, scores, cost_fp: float = 1.0, cost_fn: float = 1.0) -> Dict[str, np.ndarray]:
+    """Precision, recall, F1 and misclassification cost at every distinct threshold.
+
+    Scores are sorted once in descending order; cumulative sums of positives at
+    each distinct score give the confusion counts for ``scores >= threshold``
+    in a single vectorised pass. The first entry is the "predict nothing"
+    threshold (+inf).
+    """
+    y_true = np.asarray(y_true, dtype=float)
+    scores = np.asarray(scores, dtype=float)
+    order = np.argsort(-scores, kind='mergesort')
+    s, y = scores[order], y_true[order]
+    # last index of each run of equal scores
+    distinct = np.r_[np.flatnonzero(np.diff(s)), s.size - 1]
+    tp = np.r_[0.0, np.cumsum(y)[distinct]]
+    fp = np.r_[0.0, distinct + 1 - tp[1:]]
+    positives = y.sum()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        precision = np.where(tp + fp > 0, tp / (tp + fp), 1.0)
+        recall = tp / positives if positives > 0 else np.zeros_like(tp)
+        f1 = np.where(precision + recall > 0, 2 * precision * recall / (precision + recall), 0.0)
+    return {
+        'thresholds': np.r_[np.inf, s[distinct]],
+        'precision': precision,
+        'recall': recall,
+        'f1': f1,
+        'cost': cost_fp * fp + cost_fn * (positives - tp),
+    }
+
+
+def decision_metrics(y_true, scores, threshold: float, cost_fp: float = 1.0, cost_fn: float = 1.0) -> Dict[str, float]:
+    """Precision, recall, F1 and misclassification cost of ``scores >= threshold``."""
+    y_true = np.asarray(y_true).astype(bool)
+    pred = np.asarray(scores, dtype=float) >= threshold
+    tp = float(np.sum(pred & y_true))
+    fp = float(np.sum(pred & ~y_true))
+    fn = float(np.sum(~pred & y_true))
+    precision = tp / (tp + fp) if tp + fp > 0 else 1.0
+    recall = tp / (tp + fn) if tp + fn > 0 else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall > 0 else 0.0
+    return {'precision': precision, 'recall': recall, 'f1': f1, 'cost': cost_fp * fp + cost_fn * fn}
+
+
+def fit_decision_policy(
+    y_true,
+    proba,
+    method: Optional[str] = 'isotonic',
+    cost_fp: float = 1.0,
+    cost_fn: float = 1.0,
+    calibration_fraction: float = 0.5,
+    random_state: int = 42,
+    eval_y=None,
+    eval_proba=None,
+) -> Dict[str, Any]:
+    """Fit calibration and pick the threshold minimising expected cost.
+
+    `proba` should be held-out (e.g. out-of-fold) probabilities. They are split
+    (stratified) so the calibration map is fitted on `calibration_fraction` of
+    them and the threshold is chosen on the rest. The reported metrics are
+    computed on `eval_y`/`eval_proba` when given, otherwise on the threshold
+    split; `metrics_source` records which.
+
+    Returns a JSON-serialisable dict with the calibration knots (`x`, `y`),
+    the chosen `threshold` on the calibrated scale and the metrics at it.
+    With ``method=None`` the identity map is used and only the threshold is tuned.
+    """
+    y_true = np.asarray(y_true, dtype=float)
+    proba = np.asarray(proba, dtype=float)
+    if method is None:
+        calibration = {k: v for k, v in IDENTITY_POLICY.items() if k != 'threshold'}
+        y_thr, p_thr = y_true, proba
+    else:
+        counts = np.bincount(y_true.astype(int), minlength=2)
+        stratify = y_true if counts.min() >= 2 else None
+        p_cal, p_thr, y_cal, y_thr = train_test_split(
+            proba, y_true, train_size=calibration_fraction, stratify=stratify, random_state=random_state
+        )
+        calibration = fit_calibration(y_cal, p_cal, method=method)
+    calibrated = np.interp(p_thr, calibration['x'], calibration['y'])
+    curve = threshold_curve(y_thr, calibrated, cost_fp=cost_fp, cost_fn=cost_fn)
+    # argmin returns the first (highest) threshold among ties
+    best = int(np.argmin(curve['cost']))
+    threshold = float(curve['thresholds'][best]) if best > 0 else 1.0 + 1e-9
+
+    if eval_y is not None and eval_proba is not None:
+        eval_scores = np.interp(np.asarray(eval_proba, dtype=float), calibration['x'], calibration['y'])
+        metrics = decision_metrics(eval_y, eval_scores, threshold, cost_fp=cost_fp, cost_fn=cost_fn)
+        source = 'eval'
+    else:
+        metrics = {k: float(curve[k][best]) for k in ('precision', 'recall', 'f1', 'cost')}
+        source = 'threshold_split'
+    return {
+        **calibration,
+        'threshold': threshold,
+        'cost_fp': float(cost_fp),
+        'cost_fn': float(cost_fn),
+        **metrics,
+        'metrics_source': source,
+    }
+
+
+class DecisionPolicy:
+    """Apply a persisted calibration map and threshold with a lookup table."""
+
+    def __init__(self, policy: Dict[str, Any]):
+        self.x = np.asarray(policy['x'], dtype=float)
+        self.y = np.asarray(policy['y'], dtype=float)
+        self.threshold = float(policy['threshold'])
+        self.method = policy.get('method', 'identity')
+
+    def calibrate(self, proba) -> np.ndarray:
+        return np.interp(np.asarray(proba, dtype=float), self.x, self.y)
+
+    def decide(self, proba):
+        """Return (calibrated probabilities, 0/1 decisions)."""
+        calibrated = self.calibrate(proba)
+        return calibrated, (calibrated >= self.threshold).astype(int)
+
+
+def save_policy(policy: Dict[str, Any], path: str | Path) -> None:
+    with open(path, 'w', encoding='utf-8') as fh:
+        json.dump(policy, fh)
+
+
+def load_policy(path: str | Path) -> Optional[DecisionPolicy]:
+    p = Path(path)
+    if not p.exists():
+        return None
+    with open(p, encoding='utf-8') as fh:
+        return DecisionPolicy(json.load(fh))
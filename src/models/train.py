@@ -8,7 +8,8 @@ import numpy as np
 import pandas as pd
 from sklearn.linear_model import LogisticRegression
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import GridSearchCV, train_test_split
+from sklearn.base import clone
+from sklearn.model_selection import GridSearchCV, cross_val_predict, train_test_split
 from sklearn.metrics import (
     roc_auc_score,
     accuracy_score,
@@ -26,6 +27,9 @@ try:
 except Exception:
     mlflow = None
 
+from src.models.calibration import IDENTITY_POLICY, fit_decision_policy, save_policy
+from src.monitoring.drift import build_reference, save_reference
+
 
 def train_models(
     X: pd.DataFrame,
@@ -34,6 +38,9 @@ def train_models(
     test_size: float = 0.2,
     random_state: int = 42,
     mlflow_experiment: Optional[str] = None,
+    calibration_method: Optional[str] = 'isotonic',
+    cost_fp: float = 1.0,
+    cost_fn: float = 1.0,
 ) -> Dict[str, Any]:
     """
     Train candidate models with a proper train/test split, evaluate and optionally log to MLflow.
@@ -41,6 +48,11 @@ def train_models(
     IMPORTANT: Before calling this function, ensure that your proxy target (e.g., 'is_high_risk')
     is explicitly merged into your feature DataFrame and passed as the target `y`.
 
+    After selection, a probability calibration (`calibration_method`: 'isotonic', 'platt' or None)
+    and the decision threshold minimising `cost_fp * FP + cost_fn * FN` are fitted on out-of-fold
+    probabilities of the selected configuration on the train split (calibration and threshold on
+    disjoint halves), evaluated on the test split, and saved as `calibration.json` next to the model.
+
     Returns a dict with trained models, test metrics and persisted model path.
     """
     os.makedirs(output_dir, exist_ok=True)
@@ -92,6 +104,7 @@ def train_models(
     # Select best model by AUC on test set
     best_name = max(results.items(), key=lambda kv: kv[1]['auc'])[0]
     best_model = results[best_name]['model']
+    best_test_proba = {'logistic': y_proba_lr, 'random_forest': y_proba_rf}[best_name]
 
     # Retrain selected best model on the full dataset for deployment
     best_model.fit(X, y)
@@ -99,6 +112,40 @@ def train_models(
     joblib.dump(best_model, model_path)
     results['best'] = {'name': best_name, 'path': model_path}
 
+    # Out-of-fold probabilities of the deployed configuration on the train split; these are
+    # held-out scores, unlike the refit model's in-sample ones (pushed towards 0/1 by deep trees)
+    train_counts = pd.Series(y_train).value_counts()
+    can_calibrate = len(train_counts) == 2 and train_counts.min() >= 3 and pd.Series(y_test).nunique() == 2
+    oof_proba = None
+    if can_calibrate:
+        oof_proba = cross_val_predict(clone(best_model), X_train, y_train, cv=3, method='predict_proba')[:, 1]
+
+    # Persist the training distribution so the API can compute drift (PSI) against it
+    held_out_proba = oof_proba if oof_proba is not None else best_test_proba
+    reference = build_reference(X, held_out_proba)
+    reference_path = os.path.join(output_dir, 'reference_distribution.json')
+    save_reference(reference, reference_path)
+    results['best']['reference_path'] = reference_path
+
+    # Calibrate and choose the decision threshold on the out-of-fold probabilities;
+    # report the threshold metrics on the untouched test split
+    policy_path = os.path.join(output_dir, 'calibration.json')
+    if can_calibrate:
+        policy = fit_decision_policy(
+            y_train, oof_proba, method=calibration_method, cost_fp=cost_fp, cost_fn=cost_fn,
+            random_state=random_state, eval_y=y_test, eval_proba=best_test_proba,
+        )
+        results['best']['threshold_metrics'] = {
+            k: policy[k] for k in ('precision', 'recall', 'f1', 'cost')
+        }
+    else:
+        # not enough of both classes to calibrate; overwrite any stale policy from an earlier model
+        policy = dict(IDENTITY_POLICY)
+        results['best']['threshold_metrics'] = {}
+    save_policy(policy, policy_path)
+    results['best']['threshold'] = policy['threshold']
+    results['best']['calibration_path'] = policy_path
+
     # Optionally log to MLflow if available
     if mlflow is not None:
         mlflow.set_experiment(mlflow_experiment or os.environ.get('MLFLOW_EXPERIMENT', 'credit-risk'))
@@ -134,6 +181,17 @@ def train_models(
                 except Exception:
                     pass
 
+            mlflow.log_param('calibration_method', policy['method'])
+            mlflow.log_metric('decision_threshold', float(results['best']['threshold']))
+            for k, v in results['best']['threshold_metrics'].items():
+                mlflow.log_metric(f'best_threshold_{k}', float(v))
+
+            try:
+                mlflow.log_artifact(reference_path)
+                mlflow.log_artifact(policy_path)
+            except Exception:
+                pass
+
             # Save run id and model info
             results['mlflow_run_id'] = run.info.run_id
 
@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import json
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+FEATURE_NAMES = ('recency_days', 'frequency', 'monetary')
+OUTPUT_NAME = 'probability'
+
+
+def population_stability_index(expected: np.ndarray, actual: np.ndarray, eps: float = 1e-4) -> float:
+    """Population Stability Index between two binned distributions.
+
+    Both arrays are counts (or proportions) over the same bins. Empty bins are
+    floored at `eps` so the log term stays finite.
+    """
+    e = np.asarray(expected, dtype=float)
+    a = np.asarray(actual, dtype=float)
+    if e.sum() <= 0 or a.sum() <= 0:
+        return float('nan')
+    e = np.clip(e / e.sum(), eps, None)
+    a = np.clip(a / a.sum(), eps, None)
+    return float(np.sum((a - e) * np.log(a / e)))
+
+
+def _quantile_edges(values: np.ndarray, n_bins: int) -> np.ndarray:
+    """Interior bin edges at the training quantiles (duplicates removed)."""
+    qs = np.linspace(0.0, 1.0, n_bins + 1)[1:-1]
+    return np.unique(np.quantile(values, qs))
+
+
+def build_reference(X, proba: np.ndarray, n_bins: int = 10) -> Dict[str, dict]:
+    """Summarise the training distribution of each feature and of the predicted probability.
+
+    Parameters
+    ----------
+    X : array-like of shape (n_samples, n_features)
+        Training features, in the column order used by the model.
+    proba : np.ndarray
+        Held-out predicted positive-class probabilities (e.g. out-of-fold). In-sample
+        scores are over-confident and would make fresh data look drifted. Need not
+        be row-aligned with `X`.
+    n_bins : int
+        Number of quantile bins per variable.
+
+    Returns
+    -------
+    dict
+        Mapping of variable name to ``{'edges': [...], 'counts': [...]}``. The
+        counts include one underflow and one overflow bin around the edges.
+    """
+    cols = list(getattr(X, 'columns', FEATURE_NAMES))
+    values = np.asarray(X, dtype=float)
+    reference: Dict[str, dict] = {}
+    for i, name in enumerate(cols):
+        reference[str(name)] = _reference_entry(values[:, i], n_bins)
+    reference[OUTPUT_NAME] = _reference_entry(np.asarray(proba, dtype=float), n_bins)
+    return reference
+
+
+def _reference_entry(values: np.ndarray, n_bins: int) -> dict:
+    values = values[np.isfinite(values)]
+    edges = _quantile_edges(values, n_bins) if values.size else np.array([])
+    hist = StreamingHistogram(edges)
+    hist.update(values)
+    return {'edges': edges.tolist(), 'counts': hist.counts.tolist()}
+
+
+def save_reference(reference: Dict[str, dict], path: str | Path) -> None:
+    with open(path, 'w', encoding='utf-8') as fh:
+        json.dump(reference, fh)
+
+
+def load_reference(path: str | Path) -> Optional[Dict[str, dict]]:
+    p = Path(path)
+    if not p.exists():
+        return None
+    with open(p, encoding='utf-8') as fh:
+        return json.load(fh)
+
+
+class StreamingHistogram:
+    """Fixed-bin histogram; memory is independent of the number of updates."""
+
+    def __init__(self, edges: Sequence[float]):
+        self.edges = np.asarray(edges, dtype=float)
+        self.counts = np.zeros(self.edges.size + 1, dtype=np.int64)
+
+    def update(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=float)
+        values = values[np.isfinite(values)]
+        if values.size == 0:
+            return
+        idx = np.searchsorted(self.edges, values, side='right')
+        self.counts += np.bincount(idx, minlength=self.counts.size)
+
+    @property
+    def total(self) -> int:
+        return int(self.counts.sum())
+
+
+class ReservoirQuantiles:
+    """Approximate quantiles from a fixed-size uniform reservoir sample.
+
+    Uses vectorised reservoir sampling (Algorithm R) so a batch of `k` values
+    costs O(k) NumPy work regardless of how many values have been seen.
+    """
+
+    def __init__(self, size: int = 1024, random_state: Optional[int] = None):
+        self.size = int(size)
+        self.sample = np.empty(self.size, dtype=float)
+        self.seen = 0
+        self._rng = np.random.default_rng(random_state)
+
+    def update(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=float)
+        values = values[np.isfinite(values)]
+        if values.size == 0:
+            return
+        free = max(self.size - self.seen, 0)
+        head = values[:free]
+        self.sample[self.seen:self.seen + head.size] = head
+        self.seen += head.size
+        rest = values[free:]
+        if rest.size == 0:
+            return
+        # position of each remaining value in the overall stream (1-based)
+        positions = self.seen + np.arange(1, rest.size + 1)
+        slots = (self._rng.random(rest.size) * positions).astype(np.int64)
+        keep = slots < self.size
+        # later values win on slot collisions, matching sequential Algorithm R
+        self.sample[slots[keep]] = rest[keep]
+        self.seen += rest.size
+
+    def quantiles(self, qs: Sequence[float]) -> List[Optional[float]]:
+        n = min(self.seen, self.size)
+        if n == 0:
+            return [None for _ in qs]
+        return [float(v) for v in np.quantile(self.sample[:n], qs)]
+
+
+class DriftMonitor:
+    """In-process drift monitor for model inputs and predicted probabilities.
+
+    Observations are appended to a bounded buffer and folded into the
+    per-variable histograms and quantile sketches once `batch_size` rows have
+    accumulated (or when a snapshot is requested), so the per-request cost is a
+    list append under a lock.
+    """
+
+    quantile_levels = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+
+    def __init__(
+        self,
+        reference: Dict[str, dict],
+        feature_names: Sequence[str] = FEATURE_NAMES,
+        batch_size: int = 256,
+        reservoir_size: int = 1024,
+        random_state: Optional[int] = None,
+    ):
+        self.reference = reference
+        self.feature_names = list(feature_names)
+        self.variables = self.feature_names + [OUTPUT_NAME]
+        missing = [v for v in self.variables if v not in reference]
+        if missing:
+            raise ValueError(f'reference is missing variables: {missing}')
+        self.batch_size = int(batch_size)
+        self.histograms = {v: StreamingHistogram(reference[v]['edges']) for v in self.variables}
+        self.sketches = {v: ReservoirQuantiles(reservoir_size, random_state) for v in self.variables}
+        self._buffer: List[np.ndarray] = []
+        self._buffered_rows = 0
+        self._lock = threading.Lock()
+
+    def observe(self, X: np.ndarray, proba: np.ndarray) -> None:
+        """Record a batch of scored rows; `X` is (n, n_features), `proba` is (n,)."""
+        X = np.asarray(X, dtype=float).reshape(-1, len(self.feature_names))
+        proba = np.asarray(proba, dtype=float).reshape(-1, 1)
+        rows = np.hstack([X, proba])
+        with self._lock:
+            self._buffer.append(rows)
+            self._buffered_rows += rows.shape[0]
+            if self._buffered_rows >= self.batch_size:
+                self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        if not self._buffer:
+            return
+        block = np.vstack(self._buffer)
+        self._buffer = []
+        self._buffered_rows = 0
+        for i, name in enumerate(self.variables):
+            self.histograms[name].update(block[:, i])
+            self.sketches[name].update(block[:, i])
+
+    def snapshot(self) -> Dict[str, dict]:
+        """Flush pending rows and return PSI, counts and quantiles per variable."""
+        with self._lock:
+            self._flush_locked()
+            out: Dict[str, dict] = {}
+            for name in self.variables:
+                hist = self.histograms[name]
+                psi = population_stability_index(self.reference[name]['counts'], hist.counts)
+                out[name] = {
+                    'n': hist.total,
+                    'psi': None if np.isnan(psi) else psi,
+                    'counts': hist.counts.tolist(),
+                    'quantiles': dict(zip(
+                        [str(q) for q in self.quantile_levels],
+                        self.sketches[name].quantiles(self.quantile_levels),
+                    )),
+                }
+            return out
@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import hashlib
+import inspect
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+import joblib
+import numpy as np
+import pandas as pd
+
+
+@dataclass
+class Stage:
+    """A pipeline step: ``func(*upstream_outputs, **params)``.
+
+    `inputs` names upstream stages whose outputs are passed positionally.
+    The cache key covers the source of the module defining `func`; list other
+    modules or functions it calls in `depends_on` so edits to them invalidate
+    the cache too, or bump `version`. `outputs` lists files the stage writes as
+    a side effect: a cached result is only reused while they all still hold the
+    contents written by that cached run.
+    """
+    name: str
+    func: Callable[..., Any]
+    inputs: Sequence[str] = ()
+    params: Dict[str, Any] = field(default_factory=dict)
+    version: str = ''
+    depends_on: Sequence[Any] = ()
+    outputs: Sequence[str | Path] = ()
+
+
+def file_digest(path: str | Path, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 of a file's contents, for use as a stage parameter."""
+    h = hashlib.sha256()
+    with open(path, 'rb') as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _code_version(func: Callable[..., Any], depends_on: Sequence[Any] = ()) -> str:
+    """Hash the source of `func`, its defining module and any `depends_on` modules/functions."""
+    h = hashlib.sha256()
+    for obj in [func, inspect.getmodule(func), *depends_on]:
+        if obj is None:
+            continue
+        try:
+            source = inspect.getsource(obj)
+        except (OSError, TypeError):
+            source = f'{getattr(obj, "__module__", "")}.{getattr(obj, "__qualname__", repr(obj))}'
+        h.update(source.encode('utf-8'))
+    return h.hexdigest()
+
+
+# Artifact writers/readers keyed by type tag; the tag is stored next to the artifact.
+def _save_artifact(obj: Any, base: Path, output_digests: Optional[Dict[str, str]] = None) -> Path:
+    if isinstance(obj, pd.DataFrame):
+        path, kind = base.with_suffix('.pkl'), 'dataframe'
+        obj.to_pickle(path)
+    elif isinstance(obj, np.ndarray):
+        path, kind = base.with_suffix('.npy'), 'ndarray'
+        np.save(path, obj, allow_pickle=False)
+    else:
+        path, kind = base.with_suffix('.joblib'), 'joblib'
+        joblib.dump(obj, path)
+    with open(base.with_suffix('.json'), 'w', encoding='utf-8') as fh:
+        json.dump({'type': kind, 'file': path.name, 'outputs': output_digests or {}}, fh)
+    return path
+
+
+def _load_artifact(base: Path) -> Any:
+    with open(base.with_suffix('.json'), encoding='utf-8') as fh:
+        meta = json.load(fh)
+    path = base.parent / meta['file']
+    if meta['type'] == 'dataframe':
+        return pd.read_pickle(path)
+    if meta['type'] == 'ndarray':
+        return np.load(path, allow_pickle=False)
+    return joblib.load(path)
+
+
+def _output_digests(outputs: Sequence[str | Path]) -> Dict[str, str]:
+    return {str(p): file_digest(p) for p in outputs}
+
+
+def _is_cached(base: Path, outputs: Sequence[str | Path]) -> bool:
+    """True if the artifact exists and every side-effect output still matches what it recorded."""
+    meta_path = base.with_suffix('.json')
+    if not meta_path.exists():
+        return False
+    if not outputs:
+        return True
+    if not all(Path(p).exists() for p in outputs):
+        return False
+    with open(meta_path, encoding='utf-8') as fh:
+        recorded = json.load(fh).get('outputs', {})
+    # files overwritten by a run with a different key no longer match this key's digests
+    return recorded == _output_digests(outputs)
+
+
+class Pipeline:
+    """Run a DAG of stages with content-addressed caching and concurrent execution.
+
+    Each stage's cache key hashes its name, source code, `version`, params and
+    the keys of its inputs, so a change anywhere upstream invalidates exactly
+    the affected downstream stages. Stages whose outputs are cached and not
+    needed by a stage that has to run are skipped without loading; a stage
+    whose declared output files are missing or were overwritten since its
+    cached run is rerun.
+
+    Usage:
+      pipe = Pipeline([Stage('load', load_fn, params={'path': p}), Stage('rfm', compute_rfm, ['load'])])
+      outputs = pipe.run()
+    """
+
+    def __init__(self, stages: Iterable[Stage], cache_dir: str | Path = '.pipeline_cache', max_workers: int = 4):
+        self.stages: Dict[str, Stage] = {}
+        for stage in stages:
+            if stage.name in self.stages:
+                raise ValueError(f'duplicate stage name: {stage.name}')
+            self.stages[stage.name] = stage
+        for stage in self.stages.values():
+            unknown = [i for i in stage.inputs if i not in self.stages]
+            if unknown:
+                raise ValueError(f'stage {stage.name!r} depends on unknown stages: {unknown}')
+        self.order = self._toposort()
+        self.cache_dir = Path(cache_dir)
+        self.max_workers = max_workers
+        self.timings: Dict[str, Dict[str, Any]] = {}
+        self.total_seconds = 0.0
+
+    def _toposort(self) -> List[str]:
+        order: List[str] = []
+        state: Dict[str, int] = {}
+
+        def visit(name: str) -> None:
+            if state.get(name) == 2:
+                return
+            if state.get(name) == 1:
+                raise ValueError(f'cycle detected at stage {name!r}')
+            state[name] = 1
+            for dep in self.stages[name].inputs:
+                visit(dep)
+            state[name] = 2
+            order.append(name)
+
+        for name in self.stages:
+            visit(name)
+        return order
+
+    def keys(self) -> Dict[str, str]:
+        """Cache key for every stage."""
+        keys: Dict[str, str] = {}
+        for name in self.order:
+            stage = self.stages[name]
+            payload = json.dumps({
+                'name': name,
+                'code': _code_version(stage.func, stage.depends_on),
+                'version': stage.version,
+                'params': stage.params,
+                'inputs': [keys[i] for i in stage.inputs],
+            }, sort_keys=True, default=repr)
+            keys[name] = hashlib.sha256(payload.encode('utf-8')).hexdigest()
+        return keys
+
+    def _artifact_base(self, name: str, key: str) -> Path:
+        return self.cache_dir / f'{name}-{key[:16]}'
+
+    def run(self, targets: Optional[Sequence[str]] = None, force: bool = False, verbose: bool = True) -> Dict[str, Any]:
+        """Execute the pipeline and return the outputs of `targets` (default: all sink stages).
+
+        Set `force=True` to ignore cached artifacts.
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        keys = self.keys()
+        if targets is None:
+            consumed = {i for s in self.stages.values() for i in s.inputs}
+            targets = [n for n in self.order if n not in consumed]
+        cached = {
+            n: not force and _is_cached(self._artifact_base(n, keys[n]), self.stages[n].outputs)
+            for n in self.order
+        }
+
+        # a stage is required if it is a target or feeds a required stage that must run
+        required = set(targets)
+        for name in reversed(self.order):
+            if name in required and not cached[name]:
+                required.update(self.stages[name].inputs)
+
+        self.timings = {n: {'status': 'skipped', 'seconds': 0.0} for n in self.order}
+        outputs: Dict[str, Any] = {}
+        pending = [n for n in self.order if n in required]
+        running: Dict[Any, str] = {}
+        started = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while pending or running:
+                ready = [n for n in pending if all(i in outputs for i in self.stages[n].inputs) or cached[n]]
+                for name in ready:
+                    pending.remove(name)
+                    args = [] if cached[name] else [outputs[i] for i in self.stages[name].inputs]
+                    running[pool.submit(self._execute, name, keys[name], cached[name], args)] = name
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for fut in done:
+                    name = running.pop(fut)
+                    outputs[name] = fut.result()
+
+        self.total_seconds = time.perf_counter() - started
+        if verbose:
+            print(self.report())
+        return {n: outputs[n] for n in targets}
+
+    def _execute(self, name: str, key: str, cached: bool, args: List[Any]) -> Any:
+        stage = self.stages[name]
+        base = self._artifact_base(name, key)
+        start = time.perf_counter()
+        if cached:
+            result = _load_artifact(base)
+            status = 'cached'
+        else:
+            result = stage.func(*args, **stage.params)
+            _save_artifact(result, base, _output_digests(stage.outputs))
+            status = 'ran'
+        self.timings[name] = {'status': status, 'seconds': time.perf_counter() - start}
+        return result
+
+    def report(self) -> str:
+        """Per-stage status and wall time for the last run."""
+        width = max([len(n) for n in self.order] + [5])
+        lines = [f'{"stage":<{width}}  {"status":<7}  seconds']
+        for name in self.order:
+            t = self.timings.get(name, {'status': 'skipped', 'seconds': 0.0})
+            lines.append(f'{name:<{width}}  {t["status"]:<7}  {t["seconds"]:.3f}')
+        lines.append(f'{"total":<{width}}  {"":<7}  {self.total_seconds:.3f}')
+        return '\n'.join(lines)
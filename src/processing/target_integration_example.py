@@ -1,25 +1,71 @@
 """
 Example: Integrate is_high_risk target into processed features for model training.
+
+The steps are declared as a cached pipeline DAG (see `src/pipeline/runner.py`):
+
+    load -> rfm -> cluster -> label --+
+        \\-> features -----------------+-> merge -> train
+
+Unchanged stages are loaded from `.pipeline_cache/` instead of being recomputed,
+RFM labeling and feature creation run concurrently, and a per-stage timing
+report is printed at the end. Run with:
+
+    python -m src.processing.target_integration_example [path/to/data.csv]
 """
+import os
+import sys
+
 import pandas as pd
+import src.models.calibration
+import src.models.train
+import src.monitoring.drift
+from src.models.train import train_models
+from src.pipeline.runner import Pipeline, Stage, file_digest
 from src.processing.rfm import compute_rfm, cluster_customers_rfm, assign_high_risk_label
 from src.processing.feature_engineering import create_customer_features
 
-# Load your transaction data
-transactions = pd.read_csv('data/raw/data.csv')
 
-# Compute RFM
-rfm_df = compute_rfm(transactions)
-clustered = cluster_customers_rfm(rfm_df)
-labeled = assign_high_risk_label(clustered)
+def load_transactions(path: str, digest: str) -> pd.DataFrame:
+    # `digest` only keys the cache on the file contents
+    return pd.read_csv(path)
+
+
+def merge_target(features: pd.DataFrame, labeled: pd.DataFrame) -> pd.DataFrame:
+    # Merge is_high_risk into features
+    features = features.merge(labeled[['CustomerId', 'is_high_risk']], on='CustomerId', how='left')
+    features['is_high_risk'] = features['is_high_risk'].fillna(0).astype(int)
+    return features
+
+
+def train_on_features(features: pd.DataFrame, output_dir: str = 'models') -> dict:
+    X = features.drop(['CustomerId', 'is_high_risk'], axis=1)
+    y = features['is_high_risk']
+    return train_models(X, y, output_dir=output_dir)
+
 
-# Create features
-features = create_customer_features(transactions)
+def build_pipeline(
+    data_path: str = 'data/raw/data.csv',
+    cache_dir: str = '.pipeline_cache',
+    output_dir: str = 'models',
+) -> Pipeline:
+    # stages calling code outside this module list it in depends_on so edits invalidate the cache
+    train_code = [src.models.train, src.models.calibration, src.monitoring.drift]
+    train_outputs = [
+        os.path.join(output_dir, name)
+        for name in ('model_best.joblib', 'reference_distribution.json', 'calibration.json')
+    ]
+    return Pipeline([
+        Stage('load', load_transactions, params={'path': data_path, 'digest': file_digest(data_path)}),
+        Stage('rfm', compute_rfm, inputs=['load']),
+        Stage('cluster', cluster_customers_rfm, inputs=['rfm']),
+        Stage('label', assign_high_risk_label, inputs=['cluster']),
+        Stage('features', create_customer_features, inputs=['load']),
+        Stage('merge', merge_target, inputs=['features', 'label']),
+        # train writes the model files as a side effect; rerun it if any are missing or stale
+        Stage('train', train_on_features, inputs=['merge'], params={'output_dir': output_dir},
+              depends_on=train_code, outputs=train_outputs),
+    ], cache_dir=cache_dir)
 
-# Merge is_high_risk into features
-features = features.merge(labeled[['CustomerId', 'is_high_risk']], on='CustomerId', how='left')
-features['is_high_risk'] = features['is_high_risk'].fillna(0).astype(int)
 
-# Now features can be used for model training:
-# X = features.drop(['CustomerId', 'is_high_risk'], axis=1)
-# y = features['is_high_risk']
+if __name__ == '__main__':
+    build_pipeline(*sys.argv[1:2]).run()
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+from typing import Iterable, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+SECONDS_PER_DAY = 86400
+
+
+def _to_naive_utc(ts):
+    """Drop timezone information after converting tz-aware values to UTC."""
+    if isinstance(ts, pd.Series):
+        return ts.dt.tz_convert('UTC').dt.tz_localize(None) if ts.dt.tz is not None else ts
+    return ts.tz_convert('UTC').tz_localize(None) if ts.tz is not None else ts
+
+
+def windowed_feature_columns(windows: Sequence[int] = (7, 30, 90)) -> list:
+    """Names of the feature columns produced by `compute_windowed_rfm`."""
+    cols = ['recency_days', 'frequency', 'monetary']
+    for w in windows:
+        cols += [f'frequency_{w}d', f'monetary_{w}d']
+    return cols
+
+
+def compute_windowed_rfm(
+    transactions: pd.DataFrame,
+    snapshot_dates: Optional[Iterable] = None,
+    windows: Sequence[int] = (7, 30, 90),
+) -> pd.DataFrame:
+    """Compute to-date and trailing-window RFM features for many snapshot dates at once.
+
+    Transactions are sorted once by (customer, time) and turned into cumulative
+    sums; each (customer, snapshot, window) value is then two `searchsorted`
+    lookups and a difference, so the cost is O(rows log rows + customers x
+    snapshots x windows) instead of recomputing `compute_rfm` on filtered copies.
+
+    Only transactions at or before a snapshot are used for it, and a window of
+    `w` days covers the half-open interval ``(snapshot - w days, snapshot]``.
+    Times are compared at one-second resolution; tz-aware data is compared in
+    UTC and naive snapshot dates are taken to be UTC.
+
+    Parameters
+    ----------
+    transactions : pd.DataFrame
+        Transaction-level dataframe containing `CustomerId`, `TransactionStartTime`, and `Amount`.
+    snapshot_dates : iterable of date-like, optional
+        Reference dates. If None, uses max TransactionStartTime (the serving case).
+    windows : sequence of int
+        Trailing window lengths in days.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per (CustomerId, snapshot_date) for customers with at least one
+        transaction at or before the snapshot, with columns `recency_days`,
+        `frequency`, `monetary` and `frequency_{w}d`, `monetary_{w}d` per window.
+    """
+    if not {'CustomerId', 'TransactionStartTime', 'Amount'}.issubset(transactions.columns):
+        raise ValueError('transactions must include CustomerId, TransactionStartTime and Amount')
+
+    ts = _to_naive_utc(pd.to_datetime(transactions['TransactionStartTime'], errors='coerce'))
+    # rows without a timestamp or customer are dropped, as compute_rfm's groupby does
+    valid = (ts.notna() & transactions['CustomerId'].notna()).to_numpy()
+    codes, customers = pd.factorize(transactions['CustomerId'].to_numpy()[valid])
+    secs = ts[valid].to_numpy(dtype='datetime64[s]').astype(np.int64)
+    amount = pd.to_numeric(transactions['Amount'], errors='coerce').fillna(0.0).to_numpy(dtype=float)[valid]
+
+    if snapshot_dates is None:
+        snapshots = pd.DatetimeIndex([ts.max()]) if valid.any() else pd.DatetimeIndex([])
+    else:
+        snapshots = _to_naive_utc(pd.DatetimeIndex(pd.to_datetime(list(snapshot_dates))))
+    columns = ['CustomerId', 'snapshot_date'] + windowed_feature_columns(windows)
+    if codes.size == 0 or len(snapshots) == 0:
+        return pd.DataFrame(columns=columns)
+    snap_secs = snapshots.to_numpy(dtype='datetime64[s]').astype(np.int64)
+
+    # single sort by (customer, time), then cumulative sums with a leading zero
+    order = np.lexsort((secs, codes))
+    codes, secs, amount = codes[order], secs[order], amount[order]
+    cum_amount = np.concatenate([[0.0], np.cumsum(amount)])
+    n_customers = len(customers)
+    starts = np.concatenate([[0], np.cumsum(np.bincount(codes, minlength=n_customers))[:-1]])
+
+    # composite (customer, time) key so one global searchsorted respects customer boundaries;
+    # times are shifted to [1, span] and queries clipped to [0, span]
+    t0 = secs.min()
+    span = int(secs.max() - t0) + 1
+    keys = codes * (span + 1) + (secs - t0 + 1)
+
+    def upper_bound(cust: np.ndarray, t: np.ndarray) -> np.ndarray:
+        rel = np.clip(t - t0 + 1, 0, span)
+        return np.searchsorted(keys, cust * (span + 1) + rel, side='right')
+
+    # grid of every (snapshot, customer) pair
+    cust = np.tile(np.arange(n_customers), len(snap_secs))
+    snap = np.repeat(snap_secs, n_customers)
+    snap_idx = np.repeat(np.arange(len(snap_secs)), n_customers)
+    start = starts[cust]
+    end = upper_bound(cust, snap)
+    frequency = end - start
+    keep = frequency > 0
+    cust, snap, snap_idx, start, end, frequency = (
+        a[keep] for a in (cust, snap, snap_idx, start, end, frequency)
+    )
+
+    out = pd.DataFrame({
+        'CustomerId': customers[cust],
+        'snapshot_date': snapshots[snap_idx],
+        'recency_days': (snap - secs[end - 1]) // SECONDS_PER_DAY,
+        'frequency': frequency,
+        'monetary': cum_amount[end] - cum_amount[start],
+    })
+    for w in windows:
+        lo = upper_bound(cust, snap - int(w) * SECONDS_PER_DAY)
+        out[f'frequency_{w}d'] = end - lo
+        out[f'monetary_{w}d'] = cum_amount[end] - cum_amount[lo]
+    return out[columns].sort_values(['snapshot_date', 'CustomerId']).reset_index(drop=True)
@@ -1,5 +1,6 @@
 import joblib
 import numpy as np
+import pytest
 from sklearn.linear_model import LogisticRegression
 from fastapi.testclient import TestClient
 
@@ -26,3 +27,138 @@ def test_predict_endpoint(tmp_path, monkeypatch):
     assert resp.status_code == 200
     j = resp.json()
     assert 'probability' in j and 'prediction' in j
+
+
+def test_monitoring_endpoint(tmp_path, monkeypatch):
+    from src.monitoring.drift import build_reference, save_reference
+
+    X = np.array([[0, 1, 10], [10, 2, 100], [3, 5, 40], [20, 1, 5]])
+    y = np.array([1, 0, 1, 0])
+    model = LogisticRegression()
+    model.fit(X, y)
+    model_path = str(tmp_path / 'model_best.joblib')
+    joblib.dump(model, model_path)
+    reference = build_reference(X, model.predict_proba(X)[:, 1], n_bins=2)
+    save_reference(reference, tmp_path / 'reference_distribution.json')
+
+    monkeypatch.setenv('MODEL_PATH', model_path)
+    monkeypatch.delenv('REFERENCE_PATH', raising=False)
+    import importlib
+    import src.api.app as appmod
+    importlib.reload(appmod)
+
+    client = TestClient(appmod.app)
+    client.post('/predict', json={'recency_days': 5, 'frequency': 2, 'monetary': 50})
+    resp = client.get('/monitoring')
+    assert resp.status_code == 200
+    variables = resp.json()['variables']
+    assert set(variables) == {'recency_days', 'frequency', 'monetary', 'probability'}
+    assert variables['probability']['n'] == 1
+
+
+def test_predict_batch_binary_and_json(tmp_path, monkeypatch):
+    from src.api import codecs
+
+    X = np.array([[0, 1, 10], [10, 2, 100], [3, 5, 40]], dtype=float)
+    model = LogisticRegression()
+    model.fit(X, np.array([1, 0, 1]))
+    model_path = str(tmp_path / 'model_best.joblib')
+    joblib.dump(model, model_path)
+
+    monkeypatch.setenv('MODEL_PATH', model_path)
+    import importlib
+    import src.api.app as appmod
+    importlib.reload(appmod)
+    client = TestClient(appmod.app)
+    expected = model.predict_proba(X)[:, 1]
+
+    resp = client.post(
+        '/predict/batch',
+        content=codecs.encode_tensor(X),
+        headers={'content-type': codecs.TENSOR_MEDIA_TYPE},
+    )
+    assert resp.status_code == 200
+    assert resp.headers['content-type'] == codecs.TENSOR_MEDIA_TYPE
+    out = codecs.decode_tensor(resp.content, n_cols=2)
+    assert np.allclose(out[:, 0], expected)
+    assert np.array_equal(out[:, 1], (expected >= 0.5).astype(float))
+
+    instances = [dict(zip(['recency_days', 'frequency', 'monetary'], row)) for row in X.tolist()]
+    resp = client.post('/predict/batch', json={'instances': instances})
+    assert resp.status_code == 200
+    assert np.allclose(resp.json()['probabilities'], expected)
+
+    bad = client.post('/predict/batch', content=b'xx', headers={'content-type': codecs.TENSOR_MEDIA_TYPE})
+    assert bad.status_code == 400
+    empty = client.post('/predict/batch', content=codecs.encode_tensor(np.empty((0, 3))),
+                        headers={'content-type': codecs.TENSOR_MEDIA_TYPE})
+    assert empty.status_code == 400
+    assert client.post('/predict/batch', json={'instances': []}).status_code == 400
+    X_nan = X.copy()
+    X_nan[1, 2] = np.nan
+    nan = client.post('/predict/batch', content=codecs.encode_tensor(X_nan),
+                      headers={'content-type': codecs.TENSOR_MEDIA_TYPE})
+    assert nan.status_code == 400
+
+    pytest.importorskip('pyarrow')
+    names = ['recency_days', 'frequency', 'monetary']
+    resp = client.post(
+        '/predict/batch',
+        content=codecs.encode_arrow(**dict(zip(names, X.T))),
+        headers={'content-type': codecs.ARROW_MEDIA_TYPE},
+    )
+    assert resp.status_code == 200
+    assert resp.headers['content-type'] == codecs.ARROW_MEDIA_TYPE
+    table = codecs.pa.ipc.open_stream(codecs.pa.py_buffer(resp.content)).read_all()
+    assert np.allclose(table.column('probability').to_numpy(), expected)
+
+
+def test_predict_applies_calibration_and_threshold(tmp_path, monkeypatch):
+    from src.models.calibration import save_policy
+
+    X = np.array([[0, 1, 10], [10, 2, 100]])
+    model = LogisticRegression()
+    model.fit(X, np.array([1, 0]))
+    model_path = str(tmp_path / 'model_best.joblib')
+    joblib.dump(model, model_path)
+    # constant calibration map at 0.3 with threshold 0.25 -> always positive
+    save_policy({'method': 'isotonic', 'x': [0.0, 1.0], 'y': [0.3, 0.3], 'threshold': 0.25},
+                tmp_path / 'calibration.json')
+
+    monkeypatch.setenv('MODEL_PATH', model_path)
+    monkeypatch.delenv('CALIBRATION_PATH', raising=False)
+    import importlib
+    import src.api.app as appmod
+    importlib.reload(appmod)
+
+    client = TestClient(appmod.app)
+    j = client.post('/predict', json={'recency_days': 10, 'frequency': 2, 'monetary': 100}).json()
+    assert j['probability'] == 0.3
+    assert j['prediction'] == 1
+    assert client.get('/model-info').json()['threshold'] == 0.25
+
+
+def test_monitoring_disabled_for_mismatched_reference(tmp_path, monkeypatch):
+    from src.monitoring import drift
+
+    X = np.array([[0, 1, 10], [10, 2, 100]])
+    model = LogisticRegression()
+    model.fit(X, np.array([1, 0]))
+    model_path = str(tmp_path / 'model_best.joblib')
+    joblib.dump(model, model_path)
+    # reference for a different feature set, as written for create_customer_features models
+    drift.save_reference({'total_amount': {'edges': [], 'counts': [2]}}, tmp_path / 'reference_distribution.json')
+
+    monkeypatch.setenv('MODEL_PATH', model_path)
+    monkeypatch.delenv('REFERENCE_PATH', raising=False)
+    import importlib
+    import src.api.app as appmod
+    importlib.reload(appmod)
+    loads = []
+    monkeypatch.setattr(appmod, 'load_reference', lambda path: loads.append(path) or drift.load_reference(path))
+
+    client = TestClient(appmod.app)
+    for _ in range(3):
+        assert client.post('/predict', json={'recency_days': 5, 'frequency': 2, 'monetary': 50}).status_code == 200
+    assert len(loads) == 1
+    assert client.get('/monitoring').status_code == 404
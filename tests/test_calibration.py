@@ -0,0 +1,59 @@
+import numpy as np
+from sklearn.isotonic import IsotonicRegression
+from src.models.calibration import (
+    DecisionPolicy,
+    decision_metrics,
+    fit_calibration,
+    fit_decision_policy,
+    threshold_curve,
+)
+
+
+def make_scores(n=300, seed=0):
+    rng = np.random.RandomState(seed)
+    y = rng.randint(0, 2, size=n)
+    scores = np.clip(0.3 * y + rng.uniform(0.0, 0.7, size=n), 0, 1).round(2)
+    return y, scores
+
+
+def test_threshold_curve_matches_rethresholding():
+    y, scores = make_scores()
+    curve = threshold_curve(y, scores, cost_fp=1.0, cost_fn=5.0)
+    for t, prec, rec, cost in zip(curve['thresholds'][1:], curve['precision'][1:], curve['recall'][1:], curve['cost'][1:]):
+        pred = scores >= t
+        tp = np.sum(pred & (y == 1))
+        fp = np.sum(pred & (y == 0))
+        fn = np.sum(~pred & (y == 1))
+        assert np.isclose(prec, tp / (tp + fp))
+        assert np.isclose(rec, tp / y.sum())
+        assert np.isclose(cost, fp + 5.0 * fn)
+    assert curve['cost'][0] == 5.0 * y.sum()
+
+
+def test_isotonic_knots_reproduce_model():
+    y, scores = make_scores()
+    calib = fit_calibration(y, scores, method='isotonic')
+    iso = IsotonicRegression(y_min=0.0, y_max=1.0, out_of_bounds='clip').fit(scores, y)
+    grid = np.linspace(-0.1, 1.1, 50)
+    assert np.allclose(np.interp(grid, calib['x'], calib['y']), iso.predict(grid))
+
+
+def test_decision_policy_threshold_and_lookup():
+    y, scores = make_scores()
+    policy = fit_decision_policy(y, scores, method='platt', cost_fp=1.0, cost_fn=5.0)
+    # with expensive false negatives the threshold should sit below 0.5
+    assert policy['threshold'] < 0.5
+    calibrated, pred = DecisionPolicy(policy).decide(scores)
+    assert np.all(np.diff(calibrated[np.argsort(scores)]) >= -1e-12)
+    assert np.array_equal(pred, (calibrated >= policy['threshold']).astype(int))
+
+
+def test_decision_policy_reports_eval_metrics():
+    y, scores = make_scores()
+    y_eval, scores_eval = make_scores(seed=1)
+    policy = fit_decision_policy(y, scores, method='isotonic', eval_y=y_eval, eval_proba=scores_eval)
+    assert policy['metrics_source'] == 'eval'
+    calibrated = DecisionPolicy(policy).calibrate(scores_eval)
+    expected = decision_metrics(y_eval, calibrated, policy['threshold'])
+    for k in ('precision', 'recall', 'f1', 'cost'):
+        assert np.isclose(policy[k], expected[k])
@@ -1,3 +1,6 @@
+import json
+import os
+
 import pandas as pd
 import numpy as np
 from src.models import train
@@ -16,8 +19,26 @@ def make_sample_features(n=100):
     return X, pd.Series(y.astype(int))
 
 
-def test_train_models_runs():
+def test_train_models_runs(tmp_path):
     X, y = make_sample_features(60)
-    res = train.train_models(X, y, output_dir='models_test')
+    res = train.train_models(X, y, output_dir=str(tmp_path))
     assert 'logistic' in res and 'random_forest' in res
     assert 'best' in res and 'path' in res['best']
+    assert 0.0 <= res['best']['threshold'] <= 1.0 + 1e-6
+    assert os.path.exists(res['best']['calibration_path'])
+    with open(res['best']['calibration_path']) as fh:
+        assert json.load(fh)['metrics_source'] == 'eval'
+
+
+def test_train_models_overwrites_stale_calibration(tmp_path):
+    X, y = make_sample_features(60)
+    # too few positives to calibrate: only an identity policy can be written
+    y = pd.Series(np.zeros(len(y), dtype=int))
+    y.iloc[:3] = 1
+    stale = {'method': 'isotonic', 'x': [0.0, 1.0], 'y': [0.0, 1.0], 'threshold': 0.9}
+    with open(tmp_path / 'calibration.json', 'w') as fh:
+        json.dump(stale, fh)
+    res = train.train_models(X, y, output_dir=str(tmp_path))
+    assert res['best']['threshold'] == 0.5
+    with open(tmp_path / 'calibration.json') as fh:
+        assert json.load(fh)['method'] == 'identity'
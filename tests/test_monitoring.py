@@ -0,0 +1,86 @@
+import numpy as np
+from src.monitoring.drift import (
+    DriftMonitor,
+    ReservoirQuantiles,
+    StreamingHistogram,
+    build_reference,
+    population_stability_index,
+)
+
+
+def make_reference(n=500, seed=0):
+    rng = np.random.RandomState(seed)
+    X = np.column_stack([
+        rng.randint(0, 100, size=n),
+        rng.randint(1, 10, size=n),
+        rng.uniform(1.0, 500.0, size=n),
+    ]).astype(float)
+    proba = rng.uniform(size=n)
+    return X, proba
+
+
+def test_streaming_histogram_counts():
+    hist = StreamingHistogram([1.0, 2.0])
+    hist.update(np.array([0.5, 1.0, 1.5, 2.5, np.nan]))
+    assert hist.counts.tolist() == [1, 2, 1]
+    assert hist.total == 4
+
+
+def test_reservoir_is_bounded():
+    sketch = ReservoirQuantiles(size=64, random_state=0)
+    sketch.update(np.arange(10000, dtype=float))
+    assert sketch.seen == 10000
+    assert sketch.sample.size == 64
+    median = sketch.quantiles([0.5])[0]
+    assert 2500 < median < 7500
+
+
+def test_psi_detects_shift():
+    X, proba = make_reference()
+    reference = build_reference(X, proba)
+    same = DriftMonitor(reference, batch_size=50, random_state=0)
+    same.observe(X, proba)
+    shifted = DriftMonitor(reference, batch_size=50, random_state=0)
+    shifted.observe(X + np.array([200.0, 0.0, 0.0]), proba)
+    assert same.snapshot()['recency_days']['psi'] < 0.01
+    assert shifted.snapshot()['recency_days']['psi'] > 1.0
+    assert population_stability_index([1, 1], [1, 1]) == 0.0
+
+
+def test_monitor_buffers_until_batch():
+    X, proba = make_reference(n=10)
+    monitor = DriftMonitor(build_reference(X, proba), batch_size=100)
+    monitor.observe(X[:3], proba[:3])
+    assert monitor.histograms['probability'].total == 0
+    assert monitor.snapshot()['probability']['n'] == 3
+
+
+def test_trained_reference_has_low_probability_psi_on_fresh_data(tmp_path):
+    import joblib
+    import pandas as pd
+    from src.models import train
+    from src.monitoring.drift import load_reference
+
+    def generate(n, seed):
+        rng = np.random.RandomState(seed)
+        X = pd.DataFrame({
+            'recency_days': rng.randint(0, 100, size=n),
+            'frequency': rng.randint(1, 10, size=n),
+            'monetary': rng.uniform(1.0, 500.0, size=n),
+        })
+        # interaction target so a deep random forest is selected
+        y = ((X['recency_days'] < 50) ^ (X['frequency'] > 5)).astype(int)
+        flip = rng.uniform(size=n) < 0.1
+        return X, pd.Series(np.where(flip, 1 - y, y))
+
+    X, y = generate(2000, 0)
+    res = train.train_models(X, y, output_dir=str(tmp_path))
+    assert res['best']['name'] == 'random_forest'
+    model = joblib.load(res['best']['path'])
+
+    X_new, _ = generate(2000, 1)
+    monitor = DriftMonitor(load_reference(res['best']['reference_path']), random_state=0)
+    monitor.observe(X_new.to_numpy(dtype=float), model.predict_proba(X_new)[:, 1])
+    snapshot = monitor.snapshot()
+    assert snapshot['monetary']['psi'] < 0.1
+    assert snapshot['probability']['psi'] < 0.1
@@ -0,0 +1,135 @@
+import threading
+
+import pandas as pd
+import pytest
+from src.pipeline.runner import Pipeline, Stage
+
+CALLS = []
+
+
+def source(n):
+    CALLS.append('source')
+    return pd.DataFrame({'x': range(n)})
+
+
+def double(df):
+    CALLS.append('double')
+    return df * 2
+
+
+def total(df, offset=0):
+    CALLS.append('total')
+    return {'total': int(df['x'].sum()) + offset}
+
+
+def build(tmp_path, n=5, offset=0):
+    return Pipeline([
+        Stage('source', source, params={'n': n}),
+        Stage('double', double, inputs=['source']),
+        Stage('total', total, inputs=['double'], params={'offset': offset}),
+    ], cache_dir=tmp_path)
+
+
+def test_pipeline_caches_unchanged_stages(tmp_path):
+    CALLS.clear()
+    assert build(tmp_path).run(verbose=False) == {'total': {'total': 20}}
+    assert CALLS == ['source', 'double', 'total']
+
+    CALLS.clear()
+    pipe = build(tmp_path)
+    assert pipe.run(verbose=False) == {'total': {'total': 20}}
+    assert CALLS == []
+    assert pipe.timings['total']['status'] == 'cached'
+    assert pipe.timings['source']['status'] == 'skipped'
+
+    # a downstream param change reruns only that stage, loading its cached input
+    CALLS.clear()
+    pipe = build(tmp_path, offset=1)
+    assert pipe.run(verbose=False)['total'] == {'total': 21}
+    assert CALLS == ['total']
+    assert pipe.timings['double']['status'] == 'cached'
+    assert 'total' in pipe.report()
+
+
+def test_pipeline_runs_independent_stages_concurrently(tmp_path):
+    barrier = threading.Barrier(2, timeout=5)
+
+    def branch(value):
+        barrier.wait()
+        return value
+
+    pipe = Pipeline([
+        Stage('a', branch, params={'value': 1}),
+        Stage('b', branch, params={'value': 2}),
+        Stage('sum', lambda a, b: a + b, inputs=['a', 'b']),
+    ], cache_dir=tmp_path)
+    assert pipe.run(verbose=False) == {'sum': 3}
+
+
+def test_pipeline_rejects_cycles(tmp_path):
+    with pytest.raises(ValueError):
+        Pipeline([Stage('a', source, inputs=['b']), Stage('b', source, inputs=['a'])], cache_dir=tmp_path)
+
+
+def test_pipeline_reruns_when_side_effect_outputs_missing(tmp_path):
+    out_file = tmp_path / 'model.txt'
+
+    def write(path):
+        CALLS.append('write')
+        with open(path, 'w') as fh:
+            fh.write('model')
+        return 'done'
+
+    def build_side_effect():
+        return Pipeline([Stage('write', write, params={'path': str(out_file)}, outputs=[out_file])],
+                        cache_dir=tmp_path / 'cache')
+
+    CALLS.clear()
+    build_side_effect().run(verbose=False)
+    build_side_effect().run(verbose=False)
+    assert CALLS == ['write']
+    out_file.unlink()
+    build_side_effect().run(verbose=False)
+    assert CALLS == ['write', 'write']
+    assert out_file.exists()
+
+
+def test_pipeline_key_tracks_depends_on_source(tmp_path):
+    import importlib.util
+
+    helper = tmp_path / 'pipeline_helper_mod.py'
+    helper.write_text('def f():\n    return 1\n')
+    spec = importlib.util.spec_from_file_location('pipeline_helper_mod', helper)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+
+    def build_dep():
+        return Pipeline([Stage('a', source, params={'n': 1}, depends_on=[mod])], cache_dir=tmp_path)
+
+    before = build_dep().keys()['a']
+    assert build_dep().keys()['a'] == before
+    helper.write_text('def f():\n    return 22\n')
+    assert build_dep().keys()['a'] != before
+
+
+def test_pipeline_reruns_when_side_effect_outputs_overwritten(tmp_path):
+    out_file = tmp_path / 'model.txt'
+
+    def write(tag):
+        CALLS.append(tag)
+        out_file.write_text(tag)
+        return tag
+
+    def run_with(tag):
+        pipe = Pipeline([Stage('w', write, params={'tag': tag}, outputs=[out_file])], cache_dir=tmp_path / 'cache')
+        return pipe.run(verbose=False)
+
+    CALLS.clear()
+    assert run_with('A') == {'w': 'A'}
+    assert run_with('B') == {'w': 'B'}
+    # A's artifact is cached, but model.txt now holds B's output, so A must rerun
+    assert run_with('A') == {'w': 'A'}
+    assert out_file.read_text() == 'A'
+    assert CALLS == ['A', 'B', 'A']
+    assert run_with('A') == {'w': 'A'}
+    assert CALLS == ['A', 'B', 'A']
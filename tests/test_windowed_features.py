@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+from src.processing import rfm
+from src.processing.windowed_features import compute_windowed_rfm, windowed_feature_columns
+
+
+def make_random_tx(n=400, n_customers=15, seed=0):
+    rng = np.random.RandomState(seed)
+    start = pd.Timestamp('2025-01-01')
+    return pd.DataFrame({
+        'TransactionId': [f't{i}' for i in range(n)],
+        'CustomerId': rng.choice([f'c{i}' for i in range(n_customers)], size=n),
+        'TransactionStartTime': (start + pd.to_timedelta(rng.randint(0, 200 * 86400, size=n), unit='s')).astype(str),
+        'Amount': rng.uniform(-50.0, 500.0, size=n).round(2),
+    })
+
+
+def naive_windowed(tx, snapshot, window):
+    ts = pd.to_datetime(tx['TransactionStartTime'])
+    upto = tx[ts <= snapshot]
+    lifetime = rfm.compute_rfm(upto, snapshot_date=snapshot).set_index('CustomerId')
+    in_window = upto[pd.to_datetime(upto['TransactionStartTime']) > snapshot - pd.Timedelta(days=window)]
+    grouped = in_window.groupby('CustomerId')['Amount'].agg(['count', 'sum'])
+    lifetime[f'frequency_{window}d'] = grouped['count'].reindex(lifetime.index).fillna(0).astype(int)
+    lifetime[f'monetary_{window}d'] = grouped['sum'].reindex(lifetime.index).fillna(0.0)
+    return lifetime
+
+
+def test_windowed_matches_filtered_compute_rfm():
+    tx = make_random_tx()
+    snapshots = pd.to_datetime(['2025-02-15', '2025-04-01', '2025-07-10'])
+    out = compute_windowed_rfm(tx, snapshot_dates=snapshots, windows=(7, 30))
+    assert list(out.columns) == ['CustomerId', 'snapshot_date'] + windowed_feature_columns((7, 30))
+    for snap in snapshots:
+        got = out[out['snapshot_date'] == snap].set_index('CustomerId').sort_index()
+        for w in (7, 30):
+            expected = naive_windowed(tx, snap, w).sort_index()
+            assert list(got.index) == list(expected.index)
+            assert np.array_equal(got['recency_days'], expected['recency_days'])
+            assert np.array_equal(got['frequency'], expected['frequency'])
+            assert np.allclose(got['monetary'], expected['monetary'])
+            assert np.array_equal(got[f'frequency_{w}d'], expected[f'frequency_{w}d'])
+            assert np.allclose(got[f'monetary_{w}d'], expected[f'monetary_{w}d'])
+
+
+def test_windowed_default_snapshot_for_serving():
+    tx = pd.DataFrame({
+        'CustomerId': ['c1', 'c1', 'c2'],
+        'TransactionStartTime': ['2020-01-01T10:00:00Z', '2020-01-09T11:00:00Z', '2020-01-10T12:00:00Z'],
+        'Amount': [100.0, 50.0, 20.0],
+    })
+    out = compute_windowed_rfm(tx, windows=(7,)).set_index('CustomerId')
+    assert out.loc['c1', 'frequency'] == 2
+    assert out.loc['c1', 'frequency_7d'] == 1
+    assert out.loc['c1', 'monetary_7d'] == 50.0
+    assert out.loc['c2', 'recency_days'] == 0
+
+
+def test_windowed_drops_missing_customer():
+    tx = pd.DataFrame({
+        'CustomerId': ['c1', None, 'c1', np.nan],
+        'TransactionStartTime': ['2020-01-01', '2020-01-02', '2020-01-03', '2020-01-04'],
+        'Amount': [10.0, 20.0, 30.0, 40.0],
+    })
+    out = compute_windowed_rfm(tx, snapshot_dates=['2020-01-05'], windows=(7,))
+    assert out['CustomerId'].tolist() == ['c1']
+    assert out.loc[0, 'frequency'] == 2
+    assert out.loc[0, 'monetary'] == 40.0
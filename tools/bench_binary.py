@@ -0,0 +1,68 @@
+"""Benchmark JSON vs raw-tensor (and Arrow, if installed) payloads on /predict/batch.
+
+Usage: python tools/bench_binary.py [n_rows] [repeats]
+"""
+import importlib
+import json
+import os
+import sys
+import tempfile
+import time
+
+import joblib
+import numpy as np
+from fastapi.testclient import TestClient
+from sklearn.linear_model import LogisticRegression
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main(n_rows: int = 10000, repeats: int = 5) -> None:
+    rng = np.random.RandomState(0)
+    X = np.column_stack([
+        rng.randint(0, 100, size=n_rows),
+        rng.randint(1, 10, size=n_rows),
+        rng.uniform(1.0, 500.0, size=n_rows),
+    ]).astype(float)
+    y = (X[:, 1] > 5).astype(int)
+
+    tmp = tempfile.mkdtemp()
+    model_path = os.path.join(tmp, 'model_best.joblib')
+    joblib.dump(LogisticRegression(max_iter=1000).fit(X, y), model_path)
+    os.environ['MODEL_PATH'] = model_path
+
+    import src.api.app as appmod
+    importlib.reload(appmod)
+    from src.api import codecs
+
+    client = TestClient(appmod.app)
+    names = ['recency_days', 'frequency', 'monetary']
+
+    payloads = {
+        'json': (
+            json.dumps({'instances': [dict(zip(names, row)) for row in X.tolist()]}).encode(),
+            codecs.JSON_MEDIA_TYPE,
+        ),
+        'tensor-f64': (codecs.encode_tensor(X, np.float64), codecs.TENSOR_MEDIA_TYPE),
+        'tensor-f32': (codecs.encode_tensor(X, np.float32), codecs.TENSOR_MEDIA_TYPE),
+    }
+    if codecs.pa is not None:
+        payloads['arrow'] = (codecs.encode_arrow(**dict(zip(names, X.T))), codecs.ARROW_MEDIA_TYPE)
+
+    print(f'{n_rows} rows, best of {repeats}')
+    for name, (body, media) in payloads.items():
+        headers = {'content-type': media, 'accept': media}
+        client.post('/predict/batch', content=body, headers=headers)  # warm-up
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            resp = client.post('/predict/batch', content=body, headers=headers)
+            timings.append(time.perf_counter() - start)
+            resp.raise_for_status()
+        best = min(timings)
+        print(f'  {name:<11} {len(body) / 1024:>9.1f} KiB  {best * 1000:>8.2f} ms  {n_rows / best:>12.0f} rows/s')
+
+
+if __name__ == '__main__':
+    args = [int(a) for a in sys.argv[1:3]]
+    main(*args)